@@ -1,44 +1,108 @@
 """Slash commands for PoloSeek"""
+import time
 import discord
+from discord import app_commands
 from discord.ext import commands
+from discord.utils import format_dt
 from datetime import datetime, timedelta
+from functools import wraps
 from typing import TYPE_CHECKING, Optional
 
-from config import OWNER_ID, DEFAULT_OWNER_ID, CDT
-from utils import ensure_cdt_timezone, parse_datetime_input
+from config import CFG, CDT
+from utils import parse_datetime_input, to_timestamp, from_timestamp, FMT_INPUT
 from database import (
-    get_current_owner, update_parking_pass_owner, transfer_pass_with_lock,
-    check_reservation_conflicts, create_reservation, get_reservations,
-    get_user_next_unapproved_reservation, approve_reservation_by_details,
-    get_user_memo, get_user_most_recent_approved_reservation, mark_reservation_inactive
+    get_current_owner, get_current_owner_with_memo, transfer_pass_with_lock,
+    check_reservation_conflicts_ts, create_reservation, get_reservations_with_status,
+    approve_next_reservation, approve_reservation_by_details,
+    get_user_memo, get_user_most_recent_approved_reservation, mark_reservation_inactive,
+    invalidate_owner_cache
 )
-from scraper import Scraper
 
 if TYPE_CHECKING:
     from poloseek import PoloSeek
 
+RED = discord.Color.red()
+GREEN = discord.Color.green()
+BLUE = discord.Color.blue()
+ORANGE = discord.Color.orange()
 
-def make_request_modal(bot: 'PoloSeek', target_user: discord.Member, is_owner_request: bool, requesting_user_id: int):
+ACCESS_DENIED_EMBED = discord.Embed(
+    title="Access Denied",
+    description="This command is restricted to the bot owner.",
+    color=RED
+)
+
+ON_BEHALF_DENIED_EMBED = discord.Embed(
+    title="Access Denied",
+    description="Only the bot owner can request reservations on behalf of other users.",
+    color=RED
+)
+
+NO_DATA_EMBED = discord.Embed(
+    title="Error",
+    description="No parking pass data found.",
+    color=RED
+)
+
+# payloads for the high-traffic embeds, only the description is filled in per call
+STATUS_TEMPLATE = {"title": "Poloseek Status", "color": GREEN.value}
+RESERVATIONS_TEMPLATE = {"title": "Parking Pass Reservations", "color": BLUE.value}
+
+STATUS_CACHE_TTL = 1.0  # seconds
+RESERVATION_ROW = "**{username}** {status}\n{start} - {end}"
+# indexed by the status code from get_reservations_with_status
+RESERVATION_STATUSES = ("🟢 ACTIVE", "📅 SCHEDULED", "✅ APPROVED", "🟡 PENDING", "🔴 EXPIRED")
+
+
+def owner_only():
+    """Restrict an app command to the bot owner"""
+    def predicate(interaction: discord.Interaction) -> bool:
+        return interaction.user.id == CFG.owner_id
+    return app_commands.check(predicate)
+
+
+def deferred(failure: str):
+    """Defer the response up front and report uncaught errors as an error embed"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+            await interaction.response.defer()
+            try:
+                await func(interaction, *args, **kwargs)
+            except Exception as e:
+                await interaction.followup.send(embed=_err(f"{failure}: {str(e)}"))
+        return wrapper
+    return decorator
+
+
+def _err(description: str) -> discord.Embed:
+    """Build a standard red error embed"""
+    return discord.Embed(title="Error", description=description, color=RED)
+
+
+def make_request_modal(bot: 'PoloSeek', target_user: discord.Member, is_owner_request: bool,
+                       requesting_user_id: int, is_owner_caller: bool):
     now = datetime.now(CDT)
     end_default = now + timedelta(minutes=1)
-    time_fmt = "%-m/%-d %-I:%M %p"
 
     class RequestModal(discord.ui.Modal, title="Request Parking Pass"):
         start_time = discord.ui.TextInput(
             label="Start",
-            default=now.strftime(time_fmt),
+            default=now.strftime(FMT_INPUT),
             required=True,
             max_length=32
         )
         end_time = discord.ui.TextInput(
             label="End",
-            default=end_default.strftime(time_fmt),
+            default=end_default.strftime(FMT_INPUT),
             required=True,
             max_length=32
         )
 
         async def on_submit(self, interaction: discord.Interaction):
             try:
+                await interaction.response.defer()
+                
                 now = datetime.now(CDT)
                 start_dt = parse_datetime_input(str(self.start_time), now)
                 end_dt = parse_datetime_input(str(self.end_time), now)
@@ -47,478 +111,384 @@ def make_request_modal(bot: 'PoloSeek', target_user: discord.Member, is_owner_re
                     embed = discord.Embed(
                         title="Invalid Time",
                         description="Start time must be in the future.",
-                        color=discord.Color.red()
+                        color=RED
                     )
-                    await interaction.response.send_message(embed=embed, ephemeral=True)
+                    await interaction.followup.send(embed=embed, ephemeral=True)
                     return
 
                 if end_dt <= start_dt:
                     embed = discord.Embed(
                         title="Invalid Time",
                         description="End time must be after start time.",
-                        color=discord.Color.red()
+                        color=RED
                     )
-                    await interaction.response.send_message(embed=embed, ephemeral=True)
+                    await interaction.followup.send(embed=embed, ephemeral=True)
                     return
 
-                conflicts = check_reservation_conflicts(start_dt, end_dt)
+                # epoch values are reused for the conflict check and auto-approval
+                start_ts = to_timestamp(start_dt)
+                end_ts = to_timestamp(end_dt)
+                
+                conflicts = await bot.run_db(check_reservation_conflicts_ts, start_ts, end_ts)
                 if conflicts:
                     conflict_list = []
+                    names = await bot.get_user_display_names({c['user_id'] for c in conflicts})
                     for conflict in conflicts:
-                        username = await bot.get_user_display_name(conflict['user_id'])
-                        start = ensure_cdt_timezone(datetime.fromisoformat(conflict['start_time']))
-                        end = ensure_cdt_timezone(datetime.fromisoformat(conflict['end_time']))
-                        conflict_list.append(f"- {username}: {start.strftime('%m/%d %I:%M %p')} - {end.strftime('%m/%d %I:%M %p')}")
+                        username = names[conflict['user_id']]
+                        start = from_timestamp(conflict['start_time'])
+                        end = from_timestamp(conflict['end_time'])
+                        conflict_list.append(f"- {username}: {format_dt(start, 'f')} - {format_dt(end, 'f')}")
 
                     embed = discord.Embed(
                         title="Time Conflict",
                         description="The requested time conflicts with existing approved reservations:\n\n" + "\n".join(conflict_list),
-                        color=discord.Color.orange()
+                        color=ORANGE
                     )
-                    await interaction.response.send_message(embed=embed, ephemeral=True)
+                    await interaction.followup.send(embed=embed, ephemeral=True)
                     return
 
-                create_reservation(target_user.id, start_dt, end_dt)
+                await bot.run_db(create_reservation, target_user.id, start_dt, end_dt)
 
-                if requesting_user_id == OWNER_ID:
-                    approve_reservation_by_details(target_user.id, start_dt.isoformat())
+                if is_owner_caller:
+                    await bot.run_db(approve_reservation_by_details, target_user.id, start_ts)
+                    bot.wake_scheduler()
                     approval_status = "**Status:** AUTOMATICALLY APPROVED"
                 else:
                     approval_status = "**Status:** PENDING APPROVAL"
 
                 if is_owner_request:
-                    description = (
-                        f"**Requested by:** <@{requesting_user_id}> for <@{target_user.id}>\n"
-                        f"**Start:** {start_dt.strftime('%B %d, %Y at %I:%M %p CDT')}\n"
-                        f"**End:** {end_dt.strftime('%B %d, %Y at %I:%M %p CDT')}\n"
-                        f"{approval_status}"
-                    )
+                    requested_by = f"**Requested by:** <@{requesting_user_id}> for <@{target_user.id}>"
                     mention_message = f"<@{target_user.id}>, a parking pass reservation has been created for you!"
                 else:
-                    description = (
-                        f"**Requested by:** <@{target_user.id}>\n"
-                        f"**Start:** {start_dt.strftime('%B %d, %Y at %I:%M %p CDT')}\n"
-                        f"**End:** {end_dt.strftime('%B %d, %Y at %I:%M %p CDT')}\n"
-                        f"{approval_status}"
-                    )
-                    mention_message = f"<@{OWNER_ID}>, you have a new parking pass request!"
+                    requested_by = f"**Requested by:** <@{target_user.id}>"
+                    mention_message = f"<@{CFG.owner_id}>, you have a new parking pass request!"
 
+                parts = [
+                    requested_by,
+                    f"**Start:** {format_dt(start_dt, 'F')}",
+                    f"**End:** {format_dt(end_dt, 'F')}",
+                    approval_status
+                ]
                 embed = discord.Embed(
                     title="Reservation Created",
-                    description=description,
-                    color=discord.Color.blue()
+                    description="\n".join(parts),
+                    color=BLUE
                 )
-                await interaction.response.send_message(content=mention_message, embed=embed)
+                await interaction.followup.send(content=mention_message, embed=embed)
 
             except ValueError as e:
                 embed = discord.Embed(
                     title="Invalid Time Format",
                     description=f"Could not parse time input: {str(e)}\n\nTry a format like `4/28 9:00 AM` or `4/28/2026 14:00`.",
-                    color=discord.Color.red()
+                    color=RED
                 )
-                await interaction.response.send_message(embed=embed, ephemeral=True)
+                await interaction.followup.send(embed=embed, ephemeral=True)
             except Exception as e:
-                embed = discord.Embed(
-                    title="Error",
-                    description=f"Failed to create reservation: {str(e)}",
-                    color=discord.Color.red()
-                )
-                await interaction.response.send_message(embed=embed, ephemeral=True)
+                embed = _err(f"Failed to create reservation: {str(e)}")
+                await interaction.followup.send(embed=embed, ephemeral=True)
 
     return RequestModal()
 
 
 def setup_commands(bot: 'PoloSeek'):
     """Setup all slash commands"""
+    @bot.tree.error
+    async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+        """Reply to failed owner checks, hand anything else to the default handler"""
+        if isinstance(error, app_commands.CheckFailure):
+            await interaction.response.send_message(embed=ACCESS_DENIED_EMBED, ephemeral=True)
+            return
+        # the default handler logs the full traceback
+        await app_commands.CommandTree.on_error(bot.tree, interaction, error)
+        try:
+            embed = _err("Something went wrong running this command.")
+            if interaction.response.is_done():
+                await interaction.followup.send(embed=embed, ephemeral=True)
+            else:
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+        except discord.HTTPException:
+            pass
     
     @bot.tree.command(name="status", description="Show current parking pass owner")
+    @deferred("Failed to retrieve status")
     async def status_command(interaction: discord.Interaction):
         """Display current parking pass status"""
-        try:
-            current_owner = get_current_owner()
-            if not current_owner:
-                embed = discord.Embed(
-                    title="Error",
-                    description="No parking pass data found.",
-                    color=discord.Color.red()
-                )
-                await interaction.response.send_message(embed=embed)
-                return
-            
-            username = await bot.get_user_display_name(current_owner['current_owner_id'])
-            user_mention = f"<@{current_owner['current_owner_id']}>"
-            
-            # get user memo if available
-            memo = get_user_memo(current_owner['current_owner_id'])
-            memo_text = f"\n**Vehicle:** {memo}" if memo else ""
-            
-            # format timestamp
-            last_updated = ensure_cdt_timezone(datetime.fromisoformat(current_owner['last_updated']))
-            
-            embed = discord.Embed(
-                title="Poloseek Status",
-                description=f"**Current Owner:** {user_mention}{memo_text}\n**Last Updated:** {last_updated.strftime('%B %d, %Y at %I:%M %p CDT')}",
-                color=discord.Color.green()
-            )
-            
-            await interaction.response.send_message(embed=embed)
-            
-        except Exception as e:
-            embed = discord.Embed(
-                title="Error",
-                description=f"Failed to retrieve status: {str(e)}",
-                color=discord.Color.red()
-            )
-            await interaction.response.send_message(embed=embed)
+        # reuse the embed built within the last second to absorb /status spam
+        cached = bot._status_cache
+        if cached and time.monotonic() - cached[0] < STATUS_CACHE_TTL:
+            await interaction.followup.send(embed=discord.Embed.from_dict(cached[1]))
+            return
+        
+        current_owner = await bot.run_db(get_current_owner_with_memo)
+        if not current_owner:
+            await interaction.followup.send(embed=NO_DATA_EMBED)
+            return
+        
+        user_mention = f"<@{current_owner['current_owner_id']}>"
+        
+        parts = [f"**Current Owner:** {user_mention}"]
+        memo = current_owner['parking_memo']
+        if memo:
+            parts.append(f"**Vehicle:** {memo}")
+        
+        # format timestamp
+        last_updated = from_timestamp(current_owner['last_updated'])
+        parts.append(f"**Last Updated:** {format_dt(last_updated, 'F')}")
+        
+        payload = {**STATUS_TEMPLATE, "description": "\n".join(parts)}
+        bot._status_cache = (time.monotonic(), payload)
+        
+        await interaction.followup.send(embed=discord.Embed.from_dict(payload))
 
     @bot.tree.command(name="refresh", description="Refresh parking pass data (Owner only)")
+    @owner_only()
+    @deferred("Failed to refresh data")
     async def refresh_command(interaction: discord.Interaction):
         """Refresh parking pass data from transport scraper"""
-        if interaction.user.id != OWNER_ID:
-            embed = discord.Embed(
-                title="Access Denied",
-                description="This command is restricted to the bot owner.",
-                color=discord.Color.red()
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
+        # get current user from transport scraper, reporting to this interaction
+        current_user_memo = await bot.scraper.refresh_current_user(notify=interaction.followup)
         
-        try:
-            await interaction.response.defer()
-            
-            # create transport automation with notification callback
-            transport = Scraper(notification_callback=interaction.followup)
-            
-            # get current user from transport scraper
-            current_user_memo = await transport.refresh_current_user()
-            
-            # find user ID by memo
-            current_owner = get_current_owner()
-            if current_owner:
-                current_memo = get_user_memo(current_owner['current_owner_id'])
-                if current_memo != current_user_memo:
-                    await interaction.followup.send(f"Memo mismatch detected - database shows '{current_memo}' but transport shows '{current_user_memo}'")
-            
-            await bot.update_status()
-            
-            embed = discord.Embed(
-                title="Refresh Complete",
-                description=f"Current parking pass owner memo: {current_user_memo}",
-                color=discord.Color.green()
-            )
-            await interaction.followup.send(embed=embed)
-            
-        except Exception as e:
-            embed = discord.Embed(
-                title="Error",
-                description=f"Failed to refresh data: {str(e)}",
-                color=discord.Color.red()
-            )
-            await interaction.followup.send(embed=embed)
+        # re-read the owner row rather than trusting the in-process cache
+        invalidate_owner_cache()
+        
+        # find user ID by memo
+        mismatch_text = ""
+        current_owner = await bot.run_db(get_current_owner_with_memo)
+        if current_owner:
+            current_memo = current_owner['parking_memo']
+            if current_memo != current_user_memo:
+                mismatch_text = f"\n\n**Memo mismatch detected** - database shows '{current_memo}' but transport shows '{current_user_memo}'"
+        
+        await bot.update_status()
+        
+        embed = discord.Embed(
+            title="Refresh Complete",
+            description=f"Current parking pass owner memo: {current_user_memo}{mismatch_text}",
+            color=GREEN
+        )
+        await interaction.followup.send(embed=embed)
 
     @bot.tree.command(name="request", description="Request a parking pass reservation")
     async def request_command(interaction: discord.Interaction, user: Optional[discord.Member] = None):
         """Request a parking pass reservation"""
-        if user is not None and interaction.user.id != OWNER_ID:
-            embed = discord.Embed(
-                title="Access Denied",
-                description="Only the bot owner can request reservations on behalf of other users.",
-                color=discord.Color.red()
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        uid = interaction.user.id
+        # decides both who may request for others and whether the request is auto-approved
+        is_owner_caller = uid == CFG.owner_id
+        if user is not None and not is_owner_caller:
+            await interaction.response.send_message(embed=ON_BEHALF_DENIED_EMBED, ephemeral=True)
             return
 
         target_user = user if user is not None else interaction.user
         is_owner_request = user is not None
 
-        modal = make_request_modal(bot, target_user, is_owner_request, interaction.user.id)
+        modal = make_request_modal(bot, target_user, is_owner_request, uid, is_owner_caller)
         await interaction.response.send_modal(modal)
 
     @bot.tree.command(name="reservations", description="Show all active parking pass reservations")
+    @deferred("Failed to retrieve reservations")
     async def reservations_command(interaction: discord.Interaction):
         """Display all reservations with status"""
-        try:
-            reservations = get_reservations()
-            
-            if not reservations:
-                embed = discord.Embed(
-                    title="Parking Pass Reservations",
-                    description="No reservations found.",
-                    color=discord.Color.blue()
-                )
-                await interaction.response.send_message(embed=embed)
-                return
-            
-            reservation_list = []
-            now = datetime.now(CDT)
-            current_owner = get_current_owner()
-            current_owner_id = current_owner['current_owner_id'] if current_owner else None
-            
-            for reservation in reservations:
-                username = await bot.get_user_display_name(reservation['user_id'])
-                
-                start = ensure_cdt_timezone(datetime.fromisoformat(reservation['start_time']))
-                end = ensure_cdt_timezone(datetime.fromisoformat(reservation['end_time']))
-                
-                # determine status (no expired ones since those are filtered out as inactive)
-                if start <= now <= end:
-                    if reservation['user_id'] == current_owner_id:
-                        status = "🟢 ACTIVE"
-                    else:
-                        status = "📅 SCHEDULED"
-                elif start > now:
-                    if reservation['approved']:
-                        status = "✅ APPROVED"
-                    else:
-                        status = "🟡 PENDING"
-                # Note: no else clause for EXPIRED since those reservations are filtered out
-                
-                reservation_list.append(
-                    f"**{username}** {status}\n"
-                    f"{start.strftime('%m/%d %I:%M %p')} - {end.strftime('%m/%d %I:%M %p')}"
-                )
-            
-            embed = discord.Embed(
-                title="Parking Pass Reservations",
-                description="\n\n".join(reservation_list),
-                color=discord.Color.blue()
-            )
-            
-            await interaction.response.send_message(embed=embed)
-            
-        except Exception as e:
-            embed = discord.Embed(
-                title="Error",
-                description=f"Failed to retrieve reservations: {str(e)}",
-                color=discord.Color.red()
-            )
-            await interaction.response.send_message(embed=embed)
+        reservations = await bot.run_db(get_reservations_with_status, datetime.now(CDT))
+        
+        if not reservations:
+            embed = discord.Embed.from_dict({**RESERVATIONS_TEMPLATE, "description": "No reservations found."})
+            await interaction.followup.send(embed=embed)
+            return
+        
+        # resolve every distinct user concurrently instead of one fetch per row
+        names = await bot.get_user_display_names({r[0] for r in reservations})
+        
+        # status is computed by the query against now and the current owner
+        rows = (
+            RESERVATION_ROW.format_map({
+                'username': names[user_id],
+                'status': RESERVATION_STATUSES[status],
+                'start': format_dt(from_timestamp(start_ts), 'f'),
+                'end': format_dt(from_timestamp(end_ts), 'f')
+            })
+            for user_id, start_ts, end_ts, status in reservations
+        )
+        
+        embed = discord.Embed.from_dict({**RESERVATIONS_TEMPLATE, "description": "\n\n".join(rows)})
+        
+        await interaction.followup.send(embed=embed)
 
     @bot.tree.command(name="give", description="Give parking pass to a user (Owner only)")
+    @owner_only()
+    @deferred("Failed to transfer parking pass")
     async def give_command(interaction: discord.Interaction, user: discord.Member):
         """Give parking pass to specified user"""
-        if interaction.user.id != OWNER_ID:
-            embed = discord.Embed(
-                title="Access Denied",
-                description="This command is restricted to the bot owner.",
-                color=discord.Color.red()
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        # get target user memo
+        target_memo = await bot.run_db(get_user_memo, user.id)
+        if not target_memo:
+            embed = _err(f"No vehicle memo found for {user.display_name}. User must have a registered vehicle.")
+            await interaction.followup.send(embed=embed)
             return
         
-        try:
-            await interaction.response.defer()
-            
-            # get target user memo
-            target_memo = get_user_memo(user.id)
-            if not target_memo:
-                embed = discord.Embed(
-                    title="Error",
-                    description=f"No vehicle memo found for {user.display_name}. User must have a registered vehicle.",
-                    color=discord.Color.red()
-                )
-                await interaction.followup.send(embed=embed)
-                return
+        # update transport scraper first
+        await bot.scraper.update_parking_pass(target_memo, notify=interaction.followup)
+        
+        # update database after successful transport update
+        current_owner = await bot.run_db(get_current_owner)
+        if current_owner and await bot.run_db(transfer_pass_with_lock, current_owner['current_owner_id'], user.id):
+            # update bot status
+            await bot.update_status()
+            # a new owner can change whether a scheduled reservation may start
+            bot.wake_scheduler()
             
-            # update transport scraper first
-            transport = Scraper(notification_callback=interaction.followup)
-            await transport.update_parking_pass(target_memo)
+            embed = discord.Embed(
+                title="Parking Pass Transferred",
+                description=f"Parking pass has been given to {user.display_name}\n**Vehicle:** {target_memo}",
+                color=GREEN
+            )
             
-            # update database after successful transport update
-            current_owner = get_current_owner()
-            if current_owner and transfer_pass_with_lock(current_owner['current_owner_id'], user.id):
-                # update bot status
-                await bot.update_status()
-                
-                embed = discord.Embed(
-                    title="Parking Pass Transferred",
-                    description=f"Parking pass has been given to {user.display_name}\n**Vehicle:** {target_memo}",
-                    color=discord.Color.green()
-                )
-                
-                ping_message = f"<@{user.id}>, you have been given the parking pass!"
-                await interaction.followup.send(content=ping_message, embed=embed)
-                
-            else:
-                embed = discord.Embed(
-                    title="Error",
-                    description="Transport updated but database sync failed. Please check status.",
-                    color=discord.Color.orange()
-                )
-                await interaction.followup.send(embed=embed)
+            ping_message = f"<@{user.id}>, you have been given the parking pass!"
+            await interaction.followup.send(content=ping_message, embed=embed)
             
-        except Exception as e:
+        else:
             embed = discord.Embed(
                 title="Error",
-                description=f"Failed to transfer parking pass: {str(e)}",
-                color=discord.Color.red()
+                description="Transport updated but database sync failed. Please check status.",
+                color=ORANGE
             )
             await interaction.followup.send(embed=embed)
 
     @bot.tree.command(name="approve", description="Approve the next reservation for a specific user (Owner only)")
+    @owner_only()
+    @deferred("Failed to approve reservation")
     async def approve_command(interaction: discord.Interaction, user: discord.Member):
         """Approve the next pending reservation for a specific user"""
-        if interaction.user.id != OWNER_ID:
-            embed = discord.Embed(
-                title="Access Denied",
-                description="This command is restricted to the bot owner.",
-                color=discord.Color.red()
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
+        now = int(time.time())
         
-        try:
-            await interaction.response.defer()
-            
-            # get the next unapproved reservation for this user
-            next_reservation = get_user_next_unapproved_reservation(user.id)
-            
-            if not next_reservation:
-                embed = discord.Embed(
-                    title="No Reservation Found",
-                    description=f"{user.display_name} has no pending reservations to approve.",
-                    color=discord.Color.orange()
-                )
-                await interaction.followup.send(embed=embed)
-                return
-            
-            # approve the reservation in database
-            approve_reservation_by_details(user.id, next_reservation['start_time'])
-            
-            # check if we should transfer immediately
-            now = datetime.now(CDT)
-            start_time = ensure_cdt_timezone(datetime.fromisoformat(next_reservation['start_time']))
-            
-            current_owner = get_current_owner()
-            
-            # transfer immediately if reservation should start now or already started
-            should_transfer_now = (start_time <= now and 
-                                 current_owner and 
-                                 current_owner['current_owner_id'] == DEFAULT_OWNER_ID)
-            
-            transfer_msg = ""
-            
-            if should_transfer_now:
-                # get target user memo for transport update
-                target_memo = get_user_memo(user.id)
-                if target_memo:
-                    try:
-                        # update transport
-                        transport = Scraper(notification_callback=interaction.followup)
-                        await transport.update_parking_pass(target_memo)
-                        
-                        # update database
-                        if transfer_pass_with_lock(current_owner['current_owner_id'], user.id):
-                            await bot.update_status()
-                            transfer_msg = "\n\n**Pass transferred immediately** (no conflicts detected)"
-                        else:
-                            transfer_msg = "\n\n**Transport updated but database sync failed**"
-                    except Exception as e:
-                        transfer_msg = f"\n\n**Immediate transfer failed:** {str(e)}"
-                        await interaction.followup.send(f"transport update failed: {str(e)}")
-                else:
-                    transfer_msg = "\n\n**No vehicle memo found for immediate transfer**"
-            else:
-                transfer_msg = "\n\n**Pass will transfer automatically** at the scheduled time"
-            
-            # get user memo if available
-            memo = get_user_memo(user.id)
-            memo_text = f"\n**Vehicle:** {memo}" if memo else ""
-            
-            # format the reservation times
-            start = ensure_cdt_timezone(datetime.fromisoformat(next_reservation['start_time']))
-            end = ensure_cdt_timezone(datetime.fromisoformat(next_reservation['end_time']))
-            
-            embed = discord.Embed(
-                title="Reservation Approved",
-                description=f"**Approved for:** {user.display_name}{memo_text}\n**Start:** {start.strftime('%B %d, %Y at %I:%M %p CDT')}\n**End:** {end.strftime('%B %d, %Y at %I:%M %p CDT')}{transfer_msg}",
-                color=discord.Color.green()
-            )
-            
-            ping_message = f"<@{user.id}>, your reservation has been approved!"
-            await interaction.followup.send(content=ping_message, embed=embed)
-            
-        except Exception as e:
+        # approve the next unapproved reservation, reading the owner and memo in the same transaction
+        next_reservation = await bot.run_db(approve_next_reservation, user.id, now)
+        
+        if not next_reservation:
             embed = discord.Embed(
-                title="Error",
-                description=f"Failed to approve reservation: {str(e)}",
-                color=discord.Color.red()
+                title="No Reservation Found",
+                description=f"{user.display_name} has no pending reservations to approve.",
+                color=ORANGE
             )
             await interaction.followup.send(embed=embed)
-    
-    @bot.tree.command(name="revoke", description="Revoke the most recent approved reservation for a user (Owner only)")
-    async def revoke_command(interaction: discord.Interaction, user: discord.Member):
-        """Revoke the most recent approved reservation for a specific user"""
-        if interaction.user.id != OWNER_ID:
-            embed = discord.Embed(
-                title="Access Denied",
-                description="This command is restricted to the bot owner.",
-                color=discord.Color.red()
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        try:
-            await interaction.response.defer()
-            
-            # get the most recent approved reservation for this user
-            most_recent = get_user_most_recent_approved_reservation(user.id)
-            
-            if not most_recent:
-                embed = discord.Embed(
-                    title="No Reservation Found",
-                    description=f"{user.display_name} has no approved reservations to revoke.",
-                    color=discord.Color.orange()
-                )
-                await interaction.followup.send(embed=embed)
-                return
-            
-            # check if this reservation is currently active
-            now = datetime.now(CDT)
-            start_time = ensure_cdt_timezone(datetime.fromisoformat(most_recent['start_time']))
-            end_time = ensure_cdt_timezone(datetime.fromisoformat(most_recent['end_time']))
-            current_owner = get_current_owner()
-            
-            is_currently_active = (start_time <= now <= end_time and 
-                                current_owner and 
-                                current_owner['current_owner_id'] == user.id)
-            
-            # mark the reservation as inactive
-            mark_reservation_inactive(user.id, most_recent['start_time'])
-            
-            transfer_msg = ""
-            
-            # if this was the active reservation, transfer pass back to default owner
-            if is_currently_active:
+        current_owner_id = next_reservation['current_owner_id']
+        memo = next_reservation['parking_memo']
+        
+        # transfer immediately if reservation should start now or already started
+        should_transfer_now = (next_reservation['start_time'] <= now and 
+                             current_owner_id == CFG.default_owner_id)
+        
+        transfer_msg = ""
+        
+        if should_transfer_now:
+            if memo:
                 try:
-                    # attempt to transfer back to default owner with transport update
-                    success = await bot.transfer_with_transport(user.id, DEFAULT_OWNER_ID)
-                    if success:
+                    # update transport
+                    await bot.scraper.update_parking_pass(memo, notify=interaction.followup)
+                    
+                    # update database, only if the owner is still who we read above
+                    if await bot.run_db(transfer_pass_with_lock, current_owner_id, user.id):
                         await bot.update_status()
-                        transfer_msg = "\n\n**Pass returned to default owner** (active reservation revoked)"
+                        transfer_msg = "**Pass transferred immediately** (no conflicts detected)"
                     else:
-                        transfer_msg = "\n\n**Transfer failed** - manual intervention may be required"
+                        transfer_msg = "**Transport updated but database sync failed**"
                 except Exception as e:
-                    transfer_msg = f"\n\n**Transfer failed:** {str(e)}"
-                    await interaction.followup.send(f"Transport transfer failed: {str(e)}")
-            
-            # get user memo if available
-            memo = get_user_memo(user.id)
-            memo_text = f"\n**Vehicle:** {memo}" if memo else ""
-            
-            embed = discord.Embed(
-                title="Reservation Revoked",
-                description=f"**Revoked for:** {user.display_name}{memo_text}\n**Start:** {start_time.strftime('%B %d, %Y at %I:%M %p CDT')}\n**End:** {end_time.strftime('%B %d, %Y at %I:%M %p CDT')}\n**Status:** {'Was Active' if is_currently_active else 'Was Scheduled'}{transfer_msg}",
-                color=discord.Color.red()
-            )
-            
-            ping_message = f"<@{user.id}>, your approved reservation has been revoked by the owner."
-            await interaction.followup.send(content=ping_message, embed=embed)
-            
-        except Exception as e:
+                    transfer_msg = f"**Immediate transfer failed:** {str(e)}"
+            else:
+                transfer_msg = "**No vehicle memo found for immediate transfer**"
+        else:
+            transfer_msg = "**Pass will transfer automatically** at the scheduled time"
+        
+        # after our own transfer attempt, so the scheduler doesn't race it for the same swap
+        bot.wake_scheduler()
+        
+        parts = [f"**Approved for:** {user.display_name}"]
+        if memo:
+            parts.append(f"**Vehicle:** {memo}")
+        
+        # format the reservation times
+        start = from_timestamp(next_reservation['start_time'])
+        end = from_timestamp(next_reservation['end_time'])
+        parts += [f"**Start:** {format_dt(start, 'F')}", f"**End:** {format_dt(end, 'F')}", "", transfer_msg]
+        
+        embed = discord.Embed(
+            title="Reservation Approved",
+            description="\n".join(parts),
+            color=GREEN
+        )
+        
+        ping_message = f"<@{user.id}>, your reservation has been approved!"
+        await interaction.followup.send(content=ping_message, embed=embed)
+    
+    @bot.tree.command(name="revoke", description="Revoke the most recent approved reservation for a user (Owner only)")
+    @owner_only()
+    @deferred("Failed to revoke reservation")
+    async def revoke_command(interaction: discord.Interaction, user: discord.Member):
+        """Revoke the most recent approved reservation for a specific user"""
+        # get the most recent approved reservation for this user
+        most_recent = await bot.run_db(get_user_most_recent_approved_reservation, user.id)
+        
+        if not most_recent:
             embed = discord.Embed(
-                title="Error",
-                description=f"Failed to revoke reservation: {str(e)}",
-                color=discord.Color.red()
+                title="No Reservation Found",
+                description=f"{user.display_name} has no approved reservations to revoke.",
+                color=ORANGE
             )
             await interaction.followup.send(embed=embed)
+            return
+        
+        # check if this reservation is currently active
+        now = int(time.time())
+        current_owner = await bot.run_db(get_current_owner)
+        
+        is_currently_active = (most_recent['start_time'] <= now <= most_recent['end_time'] and 
+                            current_owner and 
+                            current_owner['current_owner_id'] == user.id)
+        
+        # mark the reservation as inactive
+        await bot.run_db(mark_reservation_inactive, user.id, most_recent['start_time'])
+        
+        transfer_msg = ""
+        
+        # if this was the active reservation, transfer pass back to default owner
+        if is_currently_active:
+            try:
+                # attempt to transfer back to default owner with transport update
+                success = await bot.transfer_with_transport(user.id, CFG.default_owner_id)
+                if success:
+                    await bot.update_status()
+                    transfer_msg = "**Pass returned to default owner** (active reservation revoked)"
+                else:
+                    transfer_msg = "**Transfer failed** - manual intervention may be required"
+            except Exception as e:
+                transfer_msg = f"**Transfer failed:** {str(e)}"
+        
+        # after our own transfer attempt, so the scheduler doesn't race it for the same swap
+        bot.wake_scheduler()
+        
+        # get user memo if available
+        memo = await bot.run_db(get_user_memo, user.id)
+        parts = [f"**Revoked for:** {user.display_name}"]
+        if memo:
+            parts.append(f"**Vehicle:** {memo}")
+        
+        # format the reservation times
+        start_time = from_timestamp(most_recent['start_time'])
+        end_time = from_timestamp(most_recent['end_time'])
+        parts += [
+            f"**Start:** {format_dt(start_time, 'F')}",
+            f"**End:** {format_dt(end_time, 'F')}",
+            f"**Status:** {'Was Active' if is_currently_active else 'Was Scheduled'}"
+        ]
+        if transfer_msg:
+            parts += ["", transfer_msg]
+        
+        embed = discord.Embed(
+            title="Reservation Revoked",
+            description="\n".join(parts),
+            color=RED
+        )
+        
+        ping_message = f"<@{user.id}>, your approved reservation has been revoked by the owner."
+        await interaction.followup.send(content=ping_message, embed=embed)
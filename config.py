@@ -1,13 +1,32 @@
 """Configuration for PoloSeek bot"""
 import os
-import pytz
+from dataclasses import dataclass
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
 load_dotenv()
 
-TOKEN = os.getenv('DISCORD_TOKEN')
-OWNER_ID = int(os.getenv('DISCORD_OWNER_ID'))
-CHANNEL_ID = int(os.getenv('DISCORD_CHANNEL_ID'))
-DEFAULT_OWNER_ID = int(os.getenv('DEFAULT_OWNER_ID', OWNER_ID))
 
-CDT = pytz.timezone('America/Chicago')
+@dataclass(frozen=True, slots=True)
+class Config:
+    token: str
+    owner_id: int
+    channel_id: int
+    default_owner_id: int
+
+
+CFG = Config(
+    token=os.getenv('DISCORD_TOKEN'),
+    owner_id=int(os.getenv('DISCORD_OWNER_ID')),
+    channel_id=int(os.getenv('DISCORD_CHANNEL_ID')),
+    # getenv defaults must be strings, fall back after the lookup instead
+    default_owner_id=int(os.getenv('DEFAULT_OWNER_ID') or os.getenv('DISCORD_OWNER_ID')),
+)
+
+# flat aliases for existing imports
+TOKEN = CFG.token
+OWNER_ID = CFG.owner_id
+CHANNEL_ID = CFG.channel_id
+DEFAULT_OWNER_ID = CFG.default_owner_id
+
+CDT = ZoneInfo('America/Chicago')
@@ -1,19 +1,141 @@
 """Database functions"""
 import sqlite3
-from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, List
-from utils import ensure_cdt_timezone, CDT
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, List, Tuple
+from utils import to_timestamp
+
+# bump when stored data needs converting, see _migrate()
+SCHEMA_VERSION = 1
+
+DB_PATH = 'poloseek.db'
+CLEANUP_BATCH = 500  # rows deleted per statement by cleanup_old_reservations
+
+# hot-path statements, kept as constants so every call hits the connection's statement cache
+_SQL_OWNER = 'SELECT current_owner_id, last_updated FROM parking_pass WHERE id = 1'
+_SQL_OWNER_ID = 'SELECT current_owner_id FROM parking_pass WHERE id = 1'
+_SQL_SET_OWNER = 'UPDATE parking_pass SET current_owner_id = ?, last_updated = ? WHERE id = 1'
+_SQL_TRANSFER_OWNER = _SQL_SET_OWNER + ' AND current_owner_id = ?'
+_SQL_EXPIRED = '''
+    SELECT user_id, start_time, end_time 
+    FROM reservations 
+    WHERE active_status = TRUE AND end_time <= ?
+'''
+_SQL_EXPIRE = 'UPDATE reservations SET active_status = FALSE WHERE active_status = TRUE AND end_time <= ?'
+# ends are due at end_time, starts one second later (see is_reservation_ready_to_start)
+_SQL_NEXT_EVENT = '''
+    SELECT MIN(t) FROM (
+        SELECT MIN(end_time) AS t FROM reservations
+        WHERE active_status = TRUE AND end_time > ?
+        UNION ALL
+        SELECT MIN(start_time) + 1 FROM reservations
+        WHERE active_status = TRUE AND approved = TRUE AND start_time >= ?
+    )
+'''
+_SQL_OWNER_HAS_ACTIVE = '''
+    SELECT 1 FROM reservations
+    WHERE user_id = ? AND active_status = TRUE AND start_time <= ? AND end_time > ?
+    LIMIT 1
+'''
+# next approved reservation still running or queued, with the memo to drive the transfer
+_SQL_TICK_NEXT = '''
+    SELECT r.user_id, r.start_time, r.end_time, u.parking_memo
+    FROM reservations r
+    LEFT JOIN users u ON u.user_id = r.user_id
+    WHERE r.active_status = TRUE 
+    AND r.approved = TRUE 
+    AND r.end_time > ?
+    ORDER BY r.start_time 
+    LIMIT 1
+'''
+# two ranges overlap exactly when each starts before the other ends
+_SQL_CONFLICTS = '''
+    SELECT user_id, start_time, end_time, approved
+    FROM reservations 
+    WHERE active_status = TRUE
+    AND approved = TRUE
+    AND start_time < ? AND end_time > ?
+'''
+_SQL_RESERVATIONS_WITH_STATUS = '''
+    SELECT user_id, start_time, end_time,
+        CASE
+            WHEN start_time <= ? AND ? <= end_time
+                THEN CASE WHEN user_id = (SELECT current_owner_id FROM parking_pass WHERE id = 1) THEN 0 ELSE 1 END
+            WHEN start_time > ?
+                THEN CASE WHEN approved THEN 2 ELSE 3 END
+            ELSE 4
+        END
+    FROM reservations
+    WHERE active_status = TRUE
+    ORDER BY start_time
+'''
+
+# last known parking_pass row, replaced on every owner write
+_owner_cache: Optional[Dict] = None
+# queries fill it on the bot's database thread, invalidate_owner_cache() clears it from the event loop
+_owner_lock = threading.Lock()
+
+# one connection per thread - in the bot that's the single database thread behind run_db
+_local = threading.local()
+
+def _connect() -> sqlite3.Connection:
+    """Return this thread's database connection, opening it on first use"""
+    conn = getattr(_local, 'connection', None)
+    if conn is None:
+        # autocommit mode - multi-statement writes use explicit BEGIN/COMMIT
+        conn = sqlite3.connect(DB_PATH, isolation_level=None, cached_statements=256)
+        # has to precede the WAL switch and only sticks on a brand new file,
+        # existing databases keep their mode until a full VACUUM
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('PRAGMA journal_mode=WAL')
+        # the rest are per-connection settings
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')  # KiB
+        _local.connection = conn
+    return conn
+
+def _migrate(cursor: sqlite3.Cursor):
+    """Bring data written by older versions up to SCHEMA_VERSION"""
+    cursor.execute('PRAGMA user_version')
+    version = cursor.fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        if version < 1:
+            # timestamps used to be ISO text (naive values are UTC from CURRENT_TIMESTAMP),
+            # they are now stored as integer epoch seconds
+            cursor.execute('''
+                UPDATE parking_pass
+                SET last_updated = CAST(strftime('%s', last_updated) AS INTEGER)
+                WHERE typeof(last_updated) = 'text'
+            ''')
+            cursor.execute('''
+                UPDATE reservations
+                SET start_time = CAST(strftime('%s', start_time) AS INTEGER),
+                    end_time = CAST(strftime('%s', end_time) AS INTEGER)
+                WHERE typeof(start_time) = 'text' OR typeof(end_time) = 'text'
+            ''')
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        cursor.execute('COMMIT')
+    except Exception:
+        cursor.execute('ROLLBACK')
+        raise
 
 def init_database():
     """Initialize SQLite database with required tables"""
-    conn = sqlite3.connect('poloseek.db')
+    conn = _connect()
     cursor = conn.cursor()
     
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS parking_pass (
             id INTEGER PRIMARY KEY,
             current_owner_id INTEGER NOT NULL,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            last_updated INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
         )
     ''')
     
@@ -21,8 +143,8 @@ def init_database():
         CREATE TABLE IF NOT EXISTS reservations (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
-            start_time TIMESTAMP NOT NULL,
-            end_time TIMESTAMP NOT NULL,
+            start_time INTEGER NOT NULL,
+            end_time INTEGER NOT NULL,
             active_status BOOLEAN DEFAULT TRUE,
             approved BOOLEAN DEFAULT FALSE,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -36,300 +158,209 @@ def init_database():
         )
     ''')
     
+    # conflict checks range-scan approved, active reservations by start time
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_res_approved_start
+        ON reservations (approved, active_status, start_time)
+    ''')
+    
+    # the expiry scan filters active reservations by end time every tick
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_res_active_end
+        ON reservations (active_status, end_time)
+    ''')
+    
+    # per-user lookups (approve, revoke, active checks) filter by user then start time
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_res_user_active_start
+        ON reservations (user_id, active_status, start_time)
+    ''')
+    
+    # gather planner statistics the first time, cleanup keeps them fresh with PRAGMA optimize
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+    if cursor.fetchone() is None:
+        cursor.execute('ANALYZE')
+    
+    _migrate(cursor)
+    
     # initialize parking pass if it doesn't exist
     cursor.execute('SELECT COUNT(*) FROM parking_pass')
     if cursor.fetchone()[0] == 0:
         from config import DEFAULT_OWNER_ID
         cursor.execute(
-            'INSERT INTO parking_pass (current_owner_id) VALUES (?)',
-            (DEFAULT_OWNER_ID,)
+            'INSERT INTO parking_pass (current_owner_id, last_updated) VALUES (?, ?)',
+            (DEFAULT_OWNER_ID, int(time.time()))
         )
-    
-    conn.commit()
-    conn.close()
 
 def get_current_owner() -> Optional[Dict]:
     """Get current parking pass owner"""
-    conn = sqlite3.connect('poloseek.db')
+    global _owner_cache
+    with _owner_lock:
+        if _owner_cache is None:
+            conn = _connect()
+            cursor = conn.cursor()
+            cursor.execute(_SQL_OWNER)
+            result = cursor.fetchone()
+            
+            if result:
+                _owner_cache = {
+                    'current_owner_id': result[0],
+                    'last_updated': result[1]
+                }
+        # hand out a copy so callers can't change the cached row
+        return dict(_owner_cache) if _owner_cache else None
+
+def _set_owner_cache(owner: Optional[Dict]):
+    """Replace the cached owner row, None forces a re-read"""
+    global _owner_cache
+    with _owner_lock:
+        _owner_cache = owner
+
+def invalidate_owner_cache():
+    """Force the next get_current_owner() to read from the database"""
+    _set_owner_cache(None)
+
+def get_current_owner_with_memo() -> Optional[Dict]:
+    """Get current parking pass owner together with their parking memo"""
+    conn = _connect()
     cursor = conn.cursor()
-    cursor.execute('SELECT current_owner_id, last_updated FROM parking_pass WHERE id = 1')
+    cursor.execute('''
+        SELECT p.current_owner_id, p.last_updated, u.parking_memo
+        FROM parking_pass p
+        LEFT JOIN users u ON u.user_id = p.current_owner_id
+        WHERE p.id = 1
+    ''')
     result = cursor.fetchone()
-    conn.close()
     
     if result:
         return {
             'current_owner_id': result[0],
-            'last_updated': result[1]
+            'last_updated': result[1],
+            'parking_memo': result[2]
         }
     return None
 
-def update_parking_pass_owner(user_id: int):
-    """Update parking pass owner"""
-    conn = sqlite3.connect('poloseek.db')
-    cursor = conn.cursor()
-    now_cdt = datetime.now(CDT).isoformat()
-    cursor.execute(
-        'UPDATE parking_pass SET current_owner_id = ?, last_updated = ? WHERE id = 1',
-        (user_id, now_cdt)
-    )
-    conn.commit()
-    conn.close()
-
 def transfer_pass_with_lock(from_user_id: int, to_user_id: int) -> bool:
     """Transfer pass with database-level locking to prevent race conditions"""
-    conn = sqlite3.connect('poloseek.db')
-    conn.isolation_level = 'EXCLUSIVE'  # lock database during transaction
+    conn = _connect()
     
     try:
         cursor = conn.cursor()
-        cursor.execute('BEGIN EXCLUSIVE')
+        now = int(time.time())
+        # compare-and-set in one statement, it only matches while from_user_id still owns the pass
+        cursor.execute(_SQL_TRANSFER_OWNER, (to_user_id, now, from_user_id))
         
-        # verify current owner hasn't changed
-        cursor.execute('SELECT current_owner_id FROM parking_pass WHERE id = 1')
-        current = cursor.fetchone()
-        
-        if current and current[0] == from_user_id:
-            now_cdt = datetime.now(CDT).isoformat()
-            cursor.execute(
-                'UPDATE parking_pass SET current_owner_id = ?, last_updated = ? WHERE id = 1',
-                (to_user_id, now_cdt)
-            )
-            conn.commit()
+        if cursor.rowcount == 1:
+            _set_owner_cache({'current_owner_id': to_user_id, 'last_updated': now})
             return True
         else:
-            conn.rollback()
+            # someone else moved the pass, don't trust the cached owner
+            _set_owner_cache(None)
             return False
             
     except Exception as e:
-        conn.rollback()
+        _set_owner_cache(None)
         print(f"Error transferring pass: {e}")
         return False
-    finally:
-        conn.close()
 
-def get_reservation_status(current_time: datetime) -> Optional[Dict]:
-    """Get all relevant reservation info in one efficient query"""
-    conn = sqlite3.connect('poloseek.db')
+def tick_reservations(now: int) -> Optional[Dict]:
+    """Expire ended reservations and return what the scheduler needs, in one transaction
+    
+    Returns current_owner_id, current_owner_has_active, expired_reservations and
+    next_approved (including the user's parking_memo); the returned expired
+    reservations have already been marked inactive.
+    """
+    conn = _connect()
     cursor = conn.cursor()
     
-    # get current owner
-    cursor.execute('SELECT current_owner_id FROM parking_pass WHERE id = 1')
-    current_owner = cursor.fetchone()
-    
-    if not current_owner:
-        conn.close()
-        return None
-    
-    # get expired reservations
-    cursor.execute('''
-        SELECT user_id, start_time, end_time 
-        FROM reservations 
-        WHERE active_status = TRUE AND substr(end_time, 1, 19) <= ?
-    ''', (current_time.replace(tzinfo=None).isoformat(),))
-    expired = cursor.fetchall()
-    
-    # get next approved reservation that should be active now or next in queue
-    cursor.execute('''
-        SELECT user_id, start_time, end_time 
-        FROM reservations 
-        WHERE active_status = TRUE 
-        AND approved = TRUE 
-        AND substr(end_time, 1, 19) > ?
-        ORDER BY substr(start_time, 1, 19) 
-        LIMIT 1
-    ''', (current_time.replace(tzinfo=None).isoformat(),))
-    next_approved = cursor.fetchone()
-    
-    conn.close()
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute(_SQL_OWNER_ID)
+        current_owner = cursor.fetchone()
+        if not current_owner:
+            conn.rollback()
+            return None
+        
+        cursor.execute(_SQL_EXPIRED, (now,))
+        expired = cursor.fetchall()
+        if expired:
+            # nobody else can write inside the transaction, so this hits exactly the rows read above
+            cursor.execute(_SQL_EXPIRE, (now,))
+        
+        cursor.execute(_SQL_TICK_NEXT, (now,))
+        next_approved = cursor.fetchone()
+        
+        cursor.execute(_SQL_OWNER_HAS_ACTIVE, (current_owner[0], now, now))
+        owner_has_active = cursor.fetchone() is not None
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
     
-    result = {
+    return {
         'current_owner_id': current_owner[0],
+        'current_owner_has_active': owner_has_active,
         'expired_reservations': [
-            {'user_id': r[0], 'start_time': r[1], 'end_time': r[2]} 
+            {'user_id': r[0], 'start_time': r[1], 'end_time': r[2]}
             for r in expired
         ],
-        'next_approved': None
-    }
-    
-    if next_approved:
-        result['next_approved'] = {
+        'next_approved': {
             'user_id': next_approved[0],
             'start_time': next_approved[1],
-            'end_time': next_approved[2]
-        }
-    
-    return result
+            'end_time': next_approved[2],
+            'parking_memo': next_approved[3]
+        } if next_approved else None
+    }
 
-def check_reservation_conflicts(start_time: datetime, end_time: datetime, exclude_user_id: Optional[int] = None) -> List[Dict]:
-    """Check for reservation conflicts in the given time range - only check approved reservations"""
-    conn = sqlite3.connect('poloseek.db')
+def get_next_event_time(now: int) -> Optional[int]:
+    """Epoch second of the next reservation end or approved start after now, if any"""
+    conn = _connect()
+    cursor = conn.cursor()
+    cursor.execute(_SQL_NEXT_EVENT, (now, now))
+    return cursor.fetchone()[0]
+
+def check_reservation_conflicts_ts(start_ts: int, end_ts: int, exclude_user_id: Optional[int] = None) -> List[Dict]:
+    """Check for approved reservation conflicts using precomputed epoch seconds"""
+    conn = _connect()
     cursor = conn.cursor()
-    
-    # ensure times are in CDT
-    start_time = ensure_cdt_timezone(start_time)
-    end_time = ensure_cdt_timezone(end_time)
-    
-    query = '''
-        SELECT user_id, start_time, end_time, approved
-        FROM reservations 
-        WHERE active_status = TRUE
-        AND approved = TRUE
-        AND (
-            (datetime(start_time) < datetime(?) AND datetime(end_time) > datetime(?)) OR
-            (datetime(start_time) < datetime(?) AND datetime(end_time) > datetime(?)) OR
-            (datetime(start_time) >= datetime(?) AND datetime(end_time) <= datetime(?))
-        )
-    '''
-    
-    params = [
-        end_time.isoformat(), start_time.isoformat(),
-        end_time.isoformat(), start_time.isoformat(),
-        start_time.isoformat(), end_time.isoformat()
-    ]
     
     if exclude_user_id:
-        query += ' AND user_id != ?'
-        params.append(exclude_user_id)
-    
-    cursor.execute(query, params)
+        cursor.execute(_SQL_CONFLICTS + ' AND user_id != ?', (end_ts, start_ts, exclude_user_id))
+    else:
+        cursor.execute(_SQL_CONFLICTS, (end_ts, start_ts))
     conflicts = cursor.fetchall()
-    conn.close()
     
     return [{'user_id': c[0], 'start_time': c[1], 'end_time': c[2], 'approved': c[3]} for c in conflicts]
 
 def create_reservation(user_id: int, start_time: datetime, end_time: datetime):
     """Create a new reservation"""
-    conn = sqlite3.connect('poloseek.db')
+    conn = _connect()
     cursor = conn.cursor()
     
-    # ensure times are in CDT and convert to ISO format
-    start_time = ensure_cdt_timezone(start_time)
-    end_time = ensure_cdt_timezone(end_time)
-    
     cursor.execute(
         'INSERT INTO reservations (user_id, start_time, end_time) VALUES (?, ?, ?)',
-        (user_id, start_time.isoformat(), end_time.isoformat())
-    )
-    conn.commit()
-    conn.close()
-
-def get_reservations() -> List[Dict]:
-    """Get all active reservations"""
-    conn = sqlite3.connect('poloseek.db')
-    cursor = conn.cursor()
-    cursor.execute(
-        'SELECT user_id, start_time, end_time, approved FROM reservations WHERE active_status = TRUE ORDER BY datetime(start_time)'
+        (user_id, to_timestamp(start_time), to_timestamp(end_time))
     )
-    reservations = cursor.fetchall()
-    conn.close()
-    
-    return [{'user_id': r[0], 'start_time': r[1], 'end_time': r[2], 'approved': bool(r[3])} for r in reservations]
 
-def get_user_reservations(user_id: int) -> List[Dict]:
-    """Get all active reservations for a specific user"""
-    conn = sqlite3.connect('poloseek.db')
-    cursor = conn.cursor()
-    cursor.execute(
-        'SELECT user_id, start_time, end_time FROM reservations WHERE user_id = ? AND active_status = TRUE ORDER BY datetime(start_time)',
-        (user_id,)
-    )
-    reservations = cursor.fetchall()
-    conn.close()
+def get_reservations_with_status(current_time: datetime) -> List[Tuple[int, int, int, int]]:
+    """Get all active reservations as (user_id, start_time, end_time, status) tuples
     
-    return [{'user_id': r[0], 'start_time': r[1], 'end_time': r[2]} for r in reservations]
-
-def get_user_active_reservations(user_id: int, current_time: datetime) -> List[Dict]:
-    """Get currently active reservations for a specific user"""
-    conn = sqlite3.connect('poloseek.db')
+    status: 0 = active, 1 = scheduled (started but pass not handed over), 2 = approved,
+    3 = pending, 4 = expired (ended but not yet marked inactive)
+    """
+    conn = _connect()
     cursor = conn.cursor()
-    cursor.execute('''
-        SELECT user_id, start_time, end_time 
-        FROM reservations 
-        WHERE user_id = ? 
-        AND active_status = TRUE 
-        AND datetime(start_time) <= datetime(?)
-        AND datetime(end_time) > datetime(?)
-        ORDER BY datetime(start_time)
-    ''', (user_id, current_time.isoformat(), current_time.isoformat()))
-    
-    reservations = cursor.fetchall()
-    conn.close()
-    
-    return [{'user_id': r[0], 'start_time': r[1], 'end_time': r[2]} for r in reservations]
+    now = to_timestamp(current_time)
+    cursor.execute(_SQL_RESERVATIONS_WITH_STATUS, (now, now, now))
+    return cursor.fetchall()
 
-def get_next_reservation_for_user(user_id: int) -> Optional[Dict]:
-    """Get the next pending reservation for a specific user"""
-    conn = sqlite3.connect('poloseek.db')
-    cursor = conn.cursor()
-    now = datetime.now(CDT).isoformat()
-    cursor.execute(
-        '''SELECT user_id, start_time, end_time 
-           FROM reservations 
-           WHERE user_id = ? AND active_status = TRUE AND datetime(start_time) > datetime(?)
-           ORDER BY datetime(start_time) LIMIT 1''',
-        (user_id, now)
-    )
-    result = cursor.fetchone()
-    conn.close()
-    
-    if result:
-        return {'user_id': result[0], 'start_time': result[1], 'end_time': result[2]}
-    return None
-
-def get_next_approved_reservation(current_time: Optional[datetime] = None) -> Optional[Dict]:
-    """Get the next approved reservation that should start now or in the future"""
-    if current_time is None:
-        current_time = datetime.now(CDT)
-    
-    # add 1-second buffer for edge cases
-    buffer_time = current_time - timedelta(seconds=1)
-    
-    conn = sqlite3.connect('poloseek.db')
-    cursor = conn.cursor()
-    cursor.execute(
-        '''SELECT user_id, start_time, end_time 
-           FROM reservations 
-           WHERE active_status = TRUE 
-           AND approved = TRUE 
-           AND datetime(start_time) <= datetime(?)
-           AND datetime(end_time) > datetime(?)
-           ORDER BY datetime(start_time) LIMIT 1''',
-        (buffer_time.isoformat(), current_time.isoformat())
-    )
-    result = cursor.fetchone()
-    conn.close()
-    
-    if result:
-        return {'user_id': result[0], 'start_time': result[1], 'end_time': result[2]}
-    return None
-
-def get_user_next_unapproved_reservation(user_id: int) -> Optional[Dict]:
-    """Get the next unapproved reservation for a specific user"""
-    conn = sqlite3.connect('poloseek.db')
-    cursor = conn.cursor()
-    now = datetime.now(CDT).isoformat()
-    cursor.execute(
-        '''SELECT user_id, start_time, end_time 
-           FROM reservations 
-           WHERE user_id = ? AND active_status = TRUE AND approved = FALSE AND datetime(start_time) > datetime(?)
-           ORDER BY datetime(start_time) LIMIT 1''',
-        (user_id, now)
-    )
-    result = cursor.fetchone()
-    conn.close()
-    
-    if result:
-        return {'user_id': result[0], 'start_time': result[1], 'end_time': result[2]}
-    return None
-
-def approve_reservation_by_details(user_id: int, start_time: str):
+def approve_reservation_by_details(user_id: int, start_time: int):
     """Mark a specific reservation as approved using transaction"""
-    conn = sqlite3.connect('poloseek.db')
-    conn.isolation_level = 'EXCLUSIVE'
+    conn = _connect()
     
     try:
         cursor = conn.cursor()
-        cursor.execute('BEGIN EXCLUSIVE')
+        cursor.execute('BEGIN IMMEDIATE')
         cursor.execute(
             'UPDATE reservations SET approved = TRUE WHERE user_id = ? AND start_time = ? AND active_status = TRUE',
             (user_id, start_time)
@@ -338,98 +369,107 @@ def approve_reservation_by_details(user_id: int, start_time: str):
     except Exception as e:
         conn.rollback()
         print(f"Error approving reservation: {e}")
-    finally:
-        conn.close()
 
-def get_expired_reservations(current_time: datetime) -> List[Dict]:
-    """Get reservations that have expired"""
-    conn = sqlite3.connect('poloseek.db')
+def approve_next_reservation(user_id: int, now: int) -> Optional[Dict]:
+    """Approve a user's next pending reservation that hasn't ended, returning it with the current owner and the user's memo"""
+    conn = _connect()
     cursor = conn.cursor()
-    cursor.execute(
-        'SELECT user_id, start_time, end_time FROM reservations WHERE active_status = TRUE AND substr(end_time, 1, 19) <= ?',
-        (current_time.replace(tzinfo=None).isoformat(),)
-    )
-    expired = cursor.fetchall()
-    conn.close()
     
-    return [{'user_id': r[0], 'start_time': r[1], 'end_time': r[2]} for r in expired]
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute('''
+            SELECT r.id, r.start_time, r.end_time, p.current_owner_id, u.parking_memo
+            FROM reservations r
+            JOIN parking_pass p ON p.id = 1
+            LEFT JOIN users u ON u.user_id = r.user_id
+            WHERE r.user_id = ? AND r.active_status = TRUE AND r.approved = FALSE AND r.end_time > ?
+            ORDER BY r.start_time LIMIT 1
+        ''', (user_id, now))
+        result = cursor.fetchone()
+        if result:
+            cursor.execute('UPDATE reservations SET approved = TRUE WHERE id = ?', (result[0],))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    if result:
+        return {
+            'user_id': user_id,
+            'start_time': result[1],
+            'end_time': result[2],
+            'current_owner_id': result[3],
+            'parking_memo': result[4]
+        }
+    return None
 
-def mark_reservation_inactive(user_id: int, start_time: str):
+def mark_reservation_inactive(user_id: int, start_time: int):
     """Mark a reservation as inactive"""
-    conn = sqlite3.connect('poloseek.db')
+    conn = _connect()
     cursor = conn.cursor()
     cursor.execute(
         'UPDATE reservations SET active_status = FALSE WHERE user_id = ? AND start_time = ?',
         (user_id, start_time)
     )
-    conn.commit()
-    conn.close()
-
-def clear_user_pending_reservations(user_id: int):
-    """Clear all pending reservations for a user"""
-    conn = sqlite3.connect('poloseek.db')
-    cursor = conn.cursor()
-    cursor.execute(
-        'UPDATE reservations SET active_status = FALSE WHERE user_id = ? AND active_status = TRUE',
-        (user_id,)
-    )
-    conn.commit()
-    conn.close()
-
-def approve_reservation(user_id: int, start_time: str):
-    """Approve a reservation."""
-    approve_reservation_by_details(user_id, start_time)
 
 def get_user_memo(user_id: int) -> Optional[str]:
     """Get user's parking memo"""
-    conn = sqlite3.connect('poloseek.db')
+    conn = _connect()
     cursor = conn.cursor()
     cursor.execute('SELECT parking_memo FROM users WHERE user_id = ?', (user_id,))
     result = cursor.fetchone()
-    conn.close()
     
     return result[0] if result else None
 
-def is_reservation_ready_to_start(reservation: Dict, current_time: datetime) -> bool:
+def is_reservation_ready_to_start(reservation: Dict, now: int) -> bool:
     """Check if a reservation should start now with 1-second buffer"""
-    start_time = ensure_cdt_timezone(datetime.fromisoformat(reservation['start_time']))
-    
     # add small buffer for edge cases
-    buffer_time = current_time - timedelta(seconds=1)
-    return start_time <= buffer_time
+    return reservation['start_time'] <= now - 1
 
 def cleanup_old_reservations(cutoff_date: datetime):
     """Delete old inactive reservations from the database"""
-    conn = sqlite3.connect('poloseek.db')
+    conn = _connect()
     cursor = conn.cursor()
     
-    # delete inactive reservations older than cutoff date
-    cursor.execute('''
-        DELETE FROM reservations 
-        WHERE active_status = FALSE 
-        AND datetime(end_time) < datetime(?)
-    ''', (cutoff_date.isoformat(),))
+    # delete inactive reservations older than cutoff date in small batches,
+    # each statement commits on its own so the write lock is released in between
+    cutoff = to_timestamp(cutoff_date)
+    deleted_count = 0
+    while True:
+        cursor.execute('''
+            DELETE FROM reservations WHERE id IN (
+                SELECT id FROM reservations
+                WHERE active_status = FALSE 
+                AND end_time < ?
+                LIMIT ?
+            )
+        ''', (cutoff, CLEANUP_BATCH))
+        if cursor.rowcount <= 0:
+            break
+        deleted_count += cursor.rowcount
+    
+    # hand freed pages back to the filesystem, a no-op unless auto_vacuum is incremental
+    # executescript steps the pragma to completion, a plain execute frees a single page
+    conn.executescript('PRAGMA incremental_vacuum(256)')
     
-    deleted_count = cursor.rowcount
-    conn.commit()
-    conn.close()
+    # let sqlite refresh planner statistics while we're doing maintenance anyway
+    cursor.execute('PRAGMA optimize')
     
     print(f"Deleted {deleted_count} old reservation records")
     return deleted_count
 
 def get_user_most_recent_approved_reservation(user_id: int) -> Optional[Dict]:
     """Get the most recent approved reservation for a specific user"""
-    conn = sqlite3.connect('poloseek.db')
+    conn = _connect()
     cursor = conn.cursor()
     cursor.execute(
         '''SELECT user_id, start_time, end_time 
         FROM reservations 
         WHERE user_id = ? AND active_status = TRUE AND approved = TRUE
-        ORDER BY datetime(start_time) DESC LIMIT 1''',
+        ORDER BY start_time DESC LIMIT 1''',
         (user_id,)
     )
     result = cursor.fetchone()
-    conn.close()
     
     if result:
         return {'user_id': result[0], 'start_time': result[1], 'end_time': result[2]}
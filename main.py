@@ -1,22 +1,31 @@
 # POLOSEEK
 import discord
 from discord.ext import commands, tasks
+from discord.utils import format_dt
 from datetime import datetime, timedelta
 import asyncio
-from typing import Optional
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 
 from config import TOKEN, OWNER_ID, CHANNEL_ID, DEFAULT_OWNER_ID, CDT
-from utils import ensure_cdt_timezone
+from utils import from_timestamp, FMT_STATUS
 from database import (
     init_database, get_current_owner, transfer_pass_with_lock, 
-    get_reservation_status, get_user_active_reservations, 
-    mark_reservation_inactive, is_reservation_ready_to_start,
+    tick_reservations, get_next_event_time, 
+    is_reservation_ready_to_start,
     get_user_memo, cleanup_old_reservations
 )
 from commands import setup_commands
 from enums import ReservationStatus
 from scraper import Scraper
 
+NAME_CACHE_SIZE = 512
+NAME_CACHE_TTL = 600  # seconds
+# longest the scheduler sleeps, also the retry interval for transfers that failed
+SCHEDULER_MAX_SLEEP = 60  # seconds
+
 class PoloSeek(commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
@@ -24,17 +33,24 @@ class PoloSeek(commands.Bot):
         intents.members = True
         intents.guilds = True
         super().__init__(command_prefix='!', intents=intents)
-        self.last_check_time = None  # track last check to prevent duplicate processing
+        self._scheduler_wakeup = asyncio.Event()  # set when commands change the schedule
+        self._name_cache = OrderedDict()  # user_id -> (fetched_at, display_name)
+        self._status_cache = None  # (built_at, embed dict) for /status
+        self._last_status_str = None  # presence text last sent to Discord
+        # background database work runs here, one thread so it reuses one connection
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='poloseek-db')
+        # shared by commands and automatic transfers, callers pass their own notify per operation
+        self.scraper = Scraper(notification_callback=self.log_transport_message)
         
     async def setup_hook(self):
         """Initialize database and sync commands"""
-        init_database()
+        await self.run_db(init_database)
         setup_commands(self)
         await self.tree.sync()
         print(f"Synced slash commands for {self.user}")
         
-        # background task to check for expired reservations
-        self.check_expired_reservations.start()
+        # background task to handle reservation starts and expirations
+        self._scheduler_task = asyncio.create_task(self._scheduler())
         
         # background task to cleanup old reservations (daily)
         self.cleanup_old_reservations.start()
@@ -42,36 +58,81 @@ class PoloSeek(commands.Bot):
         # update bot status
         await self.update_status()
     
+    async def close(self):
+        """Shut down the browser and the database thread along with the bot"""
+        await super().close()
+        self.scraper.shutdown()
+        self._db_executor.shutdown(wait=False)
+    
+    async def run_db(self, fn, *args):
+        """Run a blocking database helper on the bot's database thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._db_executor, fn, *args)
+    
     async def on_ready(self):
         """Called when bot is ready"""
         print(f'{self.user} has connected to Discord.')
+        # presence is not kept across reconnects, so always resend it here
+        self._last_status_str = None
         await self.update_status()
     
     async def update_status(self):
         """Update bot status to show current pass owner"""
+        # owner may have changed, so the cached /status embed is stale
+        self._status_cache = None
+        
         try:
             # make sure the bot is ready before trying to update status
             if not self.is_ready():
                 return
                 
-            current_owner = get_current_owner()
+            current_owner = await self.run_db(get_current_owner)
             if current_owner:
                 user = self.get_user(current_owner['current_owner_id'])
                 username = user.display_name if user else f"User {current_owner['current_owner_id']}"
                 
                 # convert timestamp to CDT
-                last_updated = ensure_cdt_timezone(datetime.fromisoformat(current_owner['last_updated']))
-                time_str = last_updated.strftime("%m/%d %I:%M %p CDT")
+                last_updated = from_timestamp(current_owner['last_updated'])
+                time_str = last_updated.strftime(FMT_STATUS)
+                
+                status_str = f"Updated to {username} at {time_str}"
+                if status_str == self._last_status_str:
+                    return
                 
                 activity = discord.Activity(
                     type=discord.ActivityType.watching,
-                    name=f"Updated to {username} at {time_str}"
+                    name=status_str
                 )
                 await self.change_presence(activity=activity)
+                self._last_status_str = status_str
         except Exception as e:
             print(f"Error updating status: {e}")
     
-    @tasks.loop(seconds=1)
+    def wake_scheduler(self):
+        """Re-run the reservation check now, e.g. after a reservation was approved"""
+        self._scheduler_wakeup.set()
+    
+    async def _scheduler(self):
+        """Run the reservation check at the next start/end boundary instead of polling"""
+        await self.wait_until_ready()
+        while not self.is_closed():
+            # clear first so a wakeup arriving during the check isn't lost
+            self._scheduler_wakeup.clear()
+            await self.check_expired_reservations()
+            
+            delay = SCHEDULER_MAX_SLEEP
+            try:
+                now = time.time()
+                next_event = await self.run_db(get_next_event_time, int(now))
+                if next_event is not None:
+                    delay = min(max(next_event - now, 0), SCHEDULER_MAX_SLEEP)
+            except Exception as e:
+                print(f"Error scheduling reservation check: {e}")
+            
+            try:
+                await asyncio.wait_for(self._scheduler_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+    
     async def check_expired_reservations(self):
         """Check for expired reservations and handle queue transfers"""
         try:
@@ -79,15 +140,11 @@ class PoloSeek(commands.Bot):
             if not self.is_ready():
                 return
             
-            now = datetime.now(CDT)
+            # epoch seconds, compared directly against the stored columns
+            now = int(time.time())
             
-            # prevent duplicate processing within same second
-            if self.last_check_time and self.last_check_time.second == now.second:
-                return
-            self.last_check_time = now
-            
-            # get all reservation status in one efficient query
-            status = get_reservation_status(now)
+            # expire ended reservations and read the queue in one transaction
+            status = await self.run_db(tick_reservations, now)
             if not status:
                 return
             
@@ -102,7 +159,9 @@ class PoloSeek(commands.Bot):
             
             # then handle scheduled starts (only if no expiration transfer occurred)
             if not transfer_occurred and next_approved:
-                await self.handle_scheduled_starts(next_approved, current_owner_id, now)
+                await self.handle_scheduled_starts(
+                    next_approved, current_owner_id, status['current_owner_has_active'], now
+                )
                 
         except Exception as e:
             print(f"Error checking expired reservations: {e}")
@@ -113,27 +172,25 @@ class PoloSeek(commands.Bot):
         try:
             # clean up reservations older than 7 days
             cutoff_date = datetime.now(CDT) - timedelta(days=7)
-            cleanup_old_reservations(cutoff_date)
+            await self.run_db(cleanup_old_reservations, cutoff_date)
             print(f"Cleaned up old reservations before {cutoff_date}")
         except Exception as e:
             print(f"Error cleaning up old reservations: {e}")
     
     async def handle_expired_reservations(self, expired_reservations, current_owner_id, next_approved, now):
         """Handle expired reservations and return True if transfer occurred"""
+        # already marked inactive by tick_reservations
         for reservation in expired_reservations:
-            # mark reservation as inactive
-            mark_reservation_inactive(reservation['user_id'], reservation['start_time'])
-            
             # check if this was the current pass owner
             if current_owner_id == reservation['user_id']:
                 if next_approved:
                     # check if next approved reservation should start now or is already active
-                    start_time = ensure_cdt_timezone(datetime.fromisoformat(next_approved['start_time']))
-                    if start_time <= now:
+                    if next_approved['start_time'] <= now:
                         # transfer to the next approved user with transport scraper update
                         success = await self.transfer_with_transport(
                             current_owner_id, 
-                            next_approved['user_id']
+                            next_approved['user_id'],
+                            next_approved['parking_memo']
                         )
                         if success:
                             await self.update_status()
@@ -154,60 +211,50 @@ class PoloSeek(commands.Bot):
         
         return False
     
-    async def handle_scheduled_starts(self, next_scheduled, current_owner_id, now):
+    async def handle_scheduled_starts(self, next_scheduled, current_owner_id, owner_has_active, now):
         """Handle scheduled reservation starts"""
         # only process if reservation should start and isn't already active
         if (is_reservation_ready_to_start(next_scheduled, now) and 
             current_owner_id != next_scheduled['user_id']):
             
-            # check if current owner's reservation has ended or is default owner
-            should_transfer = False
-            
-            if current_owner_id == DEFAULT_OWNER_ID:
-                should_transfer = True
-            else:
-                # check if current owner has an expired reservation
-                current_reservations = get_user_active_reservations(current_owner_id, now)
-                if not current_reservations:
-                    should_transfer = True
+            # transfer if the current owner is the default owner or their reservation has ended
+            should_transfer = current_owner_id == DEFAULT_OWNER_ID or not owner_has_active
             
             if should_transfer:
                 # transfer to scheduled approved reservation with transport scraper update
                 success = await self.transfer_with_transport(
                     current_owner_id, 
-                    next_scheduled['user_id']
+                    next_scheduled['user_id'],
+                    next_scheduled['parking_memo']
                 )
                 if success:
                     await self.update_status()
                     await self.notify_scheduled_start(next_scheduled)
     
-    async def transfer_with_transport(self, from_user_id: int, to_user_id: int) -> bool:
+    async def transfer_with_transport(self, from_user_id: int, to_user_id: int, target_memo: str = None) -> bool:
         """Transfer parking pass with transport scraper update"""
         try:
-            # get target user memo for transport update
-            target_memo = get_user_memo(to_user_id)
+            # get target user memo for transport update, unless the caller already has it
+            if target_memo is None:
+                target_memo = await self.run_db(get_user_memo, to_user_id)
             if not target_memo:
                 print(f"No vehicle memo found for user {to_user_id}, skipping transport update")
                 # still do database transfer for default owner
                 if to_user_id == DEFAULT_OWNER_ID:
-                    return transfer_pass_with_lock(from_user_id, to_user_id)
+                    return await self.run_db(transfer_pass_with_lock, from_user_id, to_user_id)
                 return False
             
-            # create transport instance for automatic transfers
-            # Note: we can't use interaction.followup here, so we'll use print for notifications
-            transport = Scraper(notification_callback=self.log_transport_message)
-            
-            # update transport scraper first
-            await transport.update_parking_pass(target_memo)
+            # update transport scraper first, no interaction here so messages go to the console
+            await self.scraper.update_parking_pass(target_memo, notify=self.log_transport_message)
             
             # update database after successful transport update
-            return transfer_pass_with_lock(from_user_id, to_user_id)
+            return await self.run_db(transfer_pass_with_lock, from_user_id, to_user_id)
             
         except Exception as e:
             print(f"Error transferring pass with transport: {e}")
             # fallback to database-only transfer for critical cases
             if to_user_id == DEFAULT_OWNER_ID:
-                return transfer_pass_with_lock(from_user_id, to_user_id)
+                return await self.run_db(transfer_pass_with_lock, from_user_id, to_user_id)
             return False
     
     async def log_transport_message(self, message: str):
@@ -230,25 +277,23 @@ class PoloSeek(commands.Bot):
                 print(f"Bot lacks 'Embed Links' permission in {channel.name}")
                 return
             
-            from_user = self.get_user(from_user_id)
-            to_user = self.get_user(to_user_id)
-            
-            from_username = from_user.display_name if from_user else f"User {from_user_id}"
-            to_username = to_user.display_name if to_user else f"User {to_user_id}"
+            names = await self.get_user_display_names((from_user_id, to_user_id))
+            from_username = names[from_user_id]
+            to_username = names[to_user_id]
             
-            start_time = ensure_cdt_timezone(datetime.fromisoformat(reservation['start_time']))
-            end_time = ensure_cdt_timezone(datetime.fromisoformat(reservation['end_time']))
+            start_time = from_timestamp(reservation['start_time'])
+            end_time = from_timestamp(reservation['end_time'])
             
             if reason == "expired":
                 embed = discord.Embed(
                     title="Parking Pass Transferred",
-                    description=f"{from_username}'s reservation expired.\nPass transferred to {to_username} for approved reservation.\n\n**New Reservation:** {start_time.strftime('%m/%d %I:%M %p')} - {end_time.strftime('%m/%d %I:%M %p')}",
+                    description=f"{from_username}'s reservation expired.\nPass transferred to {to_username} for approved reservation.\n\n**New Reservation:** {format_dt(start_time, 'f')} - {format_dt(end_time, 'f')}",
                     color=discord.Color.blue()
                 )
             else:
                 embed = discord.Embed(
                     title="Parking Pass Transferred",
-                    description=f"Pass transferred to {to_username}.\n\n**Reservation:** {start_time.strftime('%m/%d %I:%M %p')} - {end_time.strftime('%m/%d %I:%M %p')}",
+                    description=f"Pass transferred to {to_username}.\n\n**Reservation:** {format_dt(start_time, 'f')} - {format_dt(end_time, 'f')}",
                     color=discord.Color.blue()
                 )
             
@@ -265,8 +310,7 @@ class PoloSeek(commands.Bot):
         if not channel:
             return
         
-        from_user = self.get_user(from_user_id)
-        from_username = from_user.display_name if from_user else f"User {from_user_id}"
+        from_username = await self.get_user_display_name(from_user_id)
         
         embed = discord.Embed(
             title="Parking Pass Returned",
@@ -281,15 +325,14 @@ class PoloSeek(commands.Bot):
         if not channel:
             return
         
-        new_user = self.get_user(reservation['user_id'])
-        new_username = new_user.display_name if new_user else f"User {reservation['user_id']}"
+        new_username = await self.get_user_display_name(reservation['user_id'])
         
-        start_time = ensure_cdt_timezone(datetime.fromisoformat(reservation['start_time']))
-        end_time = ensure_cdt_timezone(datetime.fromisoformat(reservation['end_time']))
+        start_time = from_timestamp(reservation['start_time'])
+        end_time = from_timestamp(reservation['end_time'])
         
         embed = discord.Embed(
             title="Scheduled Reservation Started",
-            description=f"Pass transferred to {new_username} for scheduled approved reservation.\n\n**Reservation:** {start_time.strftime('%m/%d %I:%M %p')} - {end_time.strftime('%m/%d %I:%M %p')}",
+            description=f"Pass transferred to {new_username} for scheduled approved reservation.\n\n**Reservation:** {format_dt(start_time, 'f')} - {format_dt(end_time, 'f')}",
             color=discord.Color.green()
         )
         
@@ -298,16 +341,47 @@ class PoloSeek(commands.Bot):
 
     async def get_user_display_name(self, user_id: int) -> str:
         """Helper method to get user display name with fallback"""
+        cached = self._name_cache.get(user_id)
+        if cached and time.monotonic() - cached[0] < NAME_CACHE_TTL:
+            self._name_cache.move_to_end(user_id)
+            return cached[1]
+        
         try:
             user = self.get_user(user_id)
-            if user:
-                return user.display_name
-            else:
+            if not user:
                 # try to fetch user if not in cache
                 user = await self.fetch_user(user_id)
-                return user.display_name if user else f"User {user_id}"
+            if not user:
+                return f"User {user_id}"
         except:
             return f"User {user_id}"
+        
+        self._name_cache[user_id] = (time.monotonic(), user.display_name)
+        self._name_cache.move_to_end(user_id)
+        if len(self._name_cache) > NAME_CACHE_SIZE:
+            # evict least recently used entry
+            self._name_cache.popitem(last=False)
+        return user.display_name
+    
+    async def on_member_update(self, before, after):
+        """Drop cached display name when a member changes"""
+        self._name_cache.pop(after.id, None)
+    
+    async def on_user_update(self, before, after):
+        """Drop cached display name when a user changes"""
+        self._name_cache.pop(after.id, None)
+
+    async def display_name_for(self, member_or_id) -> str:
+        """Display name for a Member/User already in hand, or look up an id"""
+        if isinstance(member_or_id, int):
+            return await self.get_user_display_name(member_or_id)
+        return member_or_id.display_name
+
+    async def get_user_display_names(self, users) -> Dict[int, str]:
+        """Resolve display names for several users or ids concurrently, keyed by id"""
+        users = list(users)
+        names = await asyncio.gather(*(self.display_name_for(user) for user in users))
+        return {getattr(user, 'id', user): name for user, name in zip(users, names)}
 
 bot = PoloSeek()
 
@@ -1,64 +1,144 @@
+import asyncio
+import atexit
 import inspect
 import os
+from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 
+# relaunch chrome after this many operations to keep its memory growth in check
+DRIVER_MAX_OPS = 20
+SITE_URL = "https://myparking.tamu.edu/"
+# the profile keeps the netid session cookie between launches
+CHROME_PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".config", "google-chrome")
+CHROME_ARGS = (
+    "--window-size=1920,1080",
+    "--no-sandbox",
+    "--disable-extensions",
+    "--headless=new",
+    # skip subsystems a headless scraper never uses
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-renderer-backgrounding",
+    "--disable-features=TranslateUI,BackForwardCache",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+    "--no-first-run",
+    "--blink-settings=imagesEnabled=false",
+    f"user-data-dir={CHROME_PROFILE_DIR}",
+    "--profile-directory=Default",
+)
+CHROME_PREFS = {"profile.managed_default_content_settings.images": 2}
+# resources the scraper never reads, stylesheets stay since the clickable/invisible waits depend on layout
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp",
+    "*.woff", "*.woff2", "*.ttf",
+    "*google-analytics.com*", "*googletagmanager.com*",
+]
+
+
 class Scraper:
+    # locators, css wherever the match doesn't depend on text content
+    PERMITS_HEADING = (By.ID, "active-permits-heading")
+    NETID_LINK = (By.LINK_TEXT, "Texas A&M University NetID")
+    TOUR_CLOSE = (By.CSS_SELECTOR, "button.framer-tour-close")
+    MANAGE_VEHICLES_BTN = (By.XPATH, "//button[contains(., 'Manage Vehicles')]")
+    DIALOG = (By.CSS_SELECTOR, "div[role='dialog']")
+    UNLINK_BTN = (By.CSS_SELECTOR, "button[aria-label^='Unlink ']")
+    LINK_BTN_LABEL = "Link {memo} to Polo Rd. Garage"
+    SAVE_BTN = (By.XPATH, "//div[@role='dialog']//button[contains(., 'Save')]")
+
     def __init__(self, notification_callback=None):
         self.driver = None
-        self.notify = notification_callback or print
+        # default target, each operation can pass its own notify instead
+        self.notify = self._resolve_notify(notification_callback or print)
+        self._driver_lock = asyncio.Lock()
+        # webdriver sessions aren't thread safe, so every selenium call goes through this one thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='poloseek-browser')
+        self._ops_since_launch = 0
+        atexit.register(self.close)
 
     def _setup_driver(self):
         chrome_options = Options()
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--headless=new")
-        home_dir = os.path.expanduser("~")
-        chrome_options.add_argument(f"user-data-dir={home_dir}/.config/google-chrome")
-        chrome_options.add_argument("--profile-directory=Default")
+        for arg in CHROME_ARGS:
+            chrome_options.add_argument(arg)
+        chrome_options.add_experimental_option("prefs", CHROME_PREFS)
         self.driver = webdriver.Chrome(options=chrome_options)
+        # explicit waits only, an implicit wait would stack onto every poll
+        self.driver.implicitly_wait(0)
+        self.driver.execute_cdp_cmd("Network.enable", {})
+        self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+        self._ops_since_launch = 0
+
+    def _acquire_driver(self):
+        if self.driver is None or self._ops_since_launch >= DRIVER_MAX_OPS:
+            self.close()
+            self._setup_driver()
+        self._ops_since_launch += 1
+        return self.driver
 
-    async def _notify_async(self, message):
+    def close(self):
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"Driver quit error: {e}")
+            self.driver = None
+
+    def shutdown(self):
+        # quit on the browser thread once any running operation has finished
+        self._executor.submit(self.close)
+        self._executor.shutdown(wait=False)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    @staticmethod
+    def _resolve_notify(notify):
+        # channels and followups have send(), plain callables are called directly
+        send = getattr(notify, 'send', notify)
+        return send, inspect.iscoroutinefunction(send)
+
+    async def _notify_async(self, notify, message):
+        send, awaits = notify
         try:
-            if self.notify:
-                if hasattr(self.notify, 'send'):
-                    await self.notify.send(message)
-                elif inspect.iscoroutinefunction(self.notify):
-                    await self.notify(message)
-                else:
-                    self.notify(message)
+            if awaits:
+                await send(message)
+            else:
+                send(message)
         except Exception as e:
             print(f"Notification error: {e}")
 
     def _login(self):
-        self.driver.get("https://myparking.tamu.edu/")
+        self.driver.get(SITE_URL)
 
         WebDriverWait(self.driver, 20).until(
             EC.any_of(
-                EC.presence_of_element_located((By.ID, "active-permits-heading")),
-                EC.element_to_be_clickable((By.LINK_TEXT, "Texas A&M University NetID")),
+                EC.presence_of_element_located(self.PERMITS_HEADING),
+                EC.element_to_be_clickable(self.NETID_LINK),
             )
         )
 
-        if self.driver.find_elements(By.ID, "active-permits-heading"):
+        if self.driver.find_elements(*self.PERMITS_HEADING):
             return
 
-        self.driver.find_element(By.LINK_TEXT, "Texas A&M University NetID").click()
+        self.driver.find_element(*self.NETID_LINK).click()
 
         WebDriverWait(self.driver, 30).until(
-            EC.presence_of_element_located((By.ID, "active-permits-heading"))
+            EC.presence_of_element_located(self.PERMITS_HEADING)
         )
 
     def _dismiss_tour(self):
         try:
             close = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button.framer-tour-close"))
+                EC.element_to_be_clickable(self.TOUR_CLOSE)
             )
             close.click()
         except TimeoutException:
@@ -67,66 +147,93 @@ class Scraper:
     def _open_manage_vehicles(self):
         self._dismiss_tour()
         btn = WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//button[contains(., 'Manage Vehicles')]"))
+            EC.presence_of_element_located(self.MANAGE_VEHICLES_BTN)
         )
         self.driver.execute_script("arguments[0].click();", btn)
 
         WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//div[@role='dialog']"))
+            EC.presence_of_element_located(self.DIALOG)
         )
 
     def _get_current_user(self):
         try:
-            aria = self.driver.find_element(
-                By.XPATH, "//button[contains(@aria-label, 'Unlink')]"
+            aria = WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located(self.UNLINK_BTN)
             ).get_attribute("aria-label")
             return aria.replace("Unlink ", "").split(" from ")[0].strip()
-        except NoSuchElementException:
+        except TimeoutException:
             raise Exception("No linked vehicle found")
 
+    def _link_button(self, memo):
+        # quote the label as a css string so memos with quotes or backslashes still match
+        label = self.LINK_BTN_LABEL.format(memo=memo).replace("\\", "\\\\").replace('"', '\\"')
+        return (By.CSS_SELECTOR, f'button[aria-label="{label}"]')
+
     def _swap_vehicle(self, target_memo):
         WebDriverWait(self.driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "//button[contains(@aria-label, 'Unlink')]"))
+            EC.element_to_be_clickable(self.UNLINK_BTN)
         ).click()
 
         WebDriverWait(self.driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, f"//button[@aria-label='Link {target_memo} to Polo Rd. Garage']"))
+            EC.element_to_be_clickable(self._link_button(target_memo))
         ).click()
 
         WebDriverWait(self.driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "//div[@role='dialog']//button[contains(., 'Save')]"))
+            EC.element_to_be_clickable(self.SAVE_BTN)
         ).click()
 
         WebDriverWait(self.driver, 15).until(
-            EC.invisibility_of_element_located((By.XPATH, "//div[@role='dialog']"))
+            EC.invisibility_of_element_located(self.DIALOG)
         )
 
-    async def refresh_current_user(self):
+    def _read_current_user(self):
         try:
-            self._setup_driver()
+            self._acquire_driver()
             self._login()
             self._open_manage_vehicles()
-            current_user = self._get_current_user()
-            await self._notify_async(f"Current parking pass owner: {current_user}")
-            return current_user
-        except Exception as e:
-            await self._notify_async(f"Refresh failed: {str(e)}")
+            return self._get_current_user()
+        except Exception:
+            # the page state is unknown, start from a fresh browser next time
+            self.close()
             raise
-        finally:
-            if self.driver:
-                self.driver.quit()
 
-    async def update_parking_pass(self, target_memo):
+    def _update(self, target_memo):
         try:
-            self._setup_driver()
+            self._acquire_driver()
             self._login()
             self._open_manage_vehicles()
+            if self._get_current_user() == target_memo:
+                # already linked, nothing to click or save
+                return False
             self._swap_vehicle(target_memo)
-            await self._notify_async(f"Parking pass successfully updated to: {target_memo}")
             return True
+        except Exception:
+            self.close()
+            raise
+
+    async def refresh_current_user(self, notify=None):
+        # resolved once per operation rather than on every message
+        notify = self._resolve_notify(notify) if notify else self.notify
+        try:
+            async with self._driver_lock:
+                current_user = await self._run(self._read_current_user)
         except Exception as e:
-            await self._notify_async(f"Update failed: {str(e)}")
+            await self._notify_async(notify, f"Refresh failed: {str(e)}")
             raise
-        finally:
-            if self.driver:
-                self.driver.quit()
+        await self._notify_async(notify, f"Current parking pass owner: {current_user}")
+        return current_user
+
+    async def update_parking_pass(self, target_memo, notify=None):
+        # resolved once per operation rather than on every message
+        notify = self._resolve_notify(notify) if notify else self.notify
+        try:
+            async with self._driver_lock:
+                changed = await self._run(self._update, target_memo)
+        except Exception as e:
+            await self._notify_async(notify, f"Update failed: {str(e)}")
+            raise
+        if changed:
+            await self._notify_async(notify, f"Parking pass successfully updated to: {target_memo}")
+        else:
+            await self._notify_async(notify, f"Parking pass already assigned to: {target_memo}")
+        return True
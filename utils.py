@@ -1,57 +1,106 @@
 """Utility functions for PoloSeek bot"""
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from functools import lru_cache
 from config import CDT
 
+# embeds use discord timestamps, plain text like the presence still needs strftime
+FMT_STATUS = '%m/%d %I:%M %p CDT'
+# prefilled modal values, unpadded so they read like typed input
+FMT_INPUT = '%-m/%-d %-I:%M %p'
+
 def ensure_cdt_timezone(dt: datetime) -> datetime:
     """Ensure datetime is in CDT timezone"""
+    if dt.tzinfo is CDT:
+        # already in CDT - nothing to convert
+        return dt
     if dt.tzinfo is None:
         # naive datetime - assume it's UTC from SQLite CURRENT_TIMESTAMP and convert to CDT
         return dt.replace(tzinfo=timezone.utc).astimezone(CDT)
-    elif dt.tzinfo == timezone.utc:
-        # UTC datetime - convert to CDT
-        return dt.astimezone(CDT)
+    # aware datetime (UTC or otherwise) - convert to CDT
+    return dt.astimezone(CDT)
+
+def to_timestamp(dt: datetime) -> int:
+    """Convert a datetime to the epoch seconds stored in the database"""
+    return int(ensure_cdt_timezone(dt).timestamp())
+
+@lru_cache(maxsize=1024)
+def from_timestamp(ts: int) -> datetime:
+    """Convert stored epoch seconds to a CDT datetime"""
+    # datetimes are immutable, so the same stored value can share one instance
+    return datetime.fromtimestamp(ts, CDT)
+
+# accepted input formats, most common first
+_FORMATS = (
+    "%H:%M",
+    "%I:%M %p",
+    "%m/%d %I:%M %p",
+    "%m/%d %H:%M",
+    "%I%p",
+    "%H",
+    "%Y-%m-%d %H:%M",
+    "%m/%d/%Y %I:%M %p",
+    "%m/%d/%Y %H:%M",
+)
+# time only - the date comes from the reference date
+_TIME_ONLY = frozenset({"%H:%M", "%I:%M %p", "%I%p", "%H"})
+# month/day - the year comes from the reference date
+_MONTH_DAY = frozenset({"%m/%d %I:%M %p", "%m/%d %H:%M"})
+
+def _guess_formats(time_str: str) -> tuple:
+    """Formats the input's shape can match, tried before the full list"""
+    slashes = time_str.count('/')
+    if slashes == 2:
+        return ("%m/%d/%Y %I:%M %p", "%m/%d/%Y %H:%M")
+    if slashes:
+        return ("%m/%d %I:%M %p", "%m/%d %H:%M")
+    if '-' in time_str:
+        return ("%Y-%m-%d %H:%M",)
+    if time_str.endswith(('AM', 'PM')):
+        return ("%I:%M %p", "%I%p")
+    if ':' in time_str:
+        return ("%H:%M",)
+    return ("%H",)
+
+def _parse_with_format(time_str: str, fmt: str, ref_date: date) -> datetime:
+    """Parse with a single format, raising ValueError if it doesn't match"""
+    if fmt in _TIME_ONLY:
+        parsed_time = datetime.strptime(time_str, fmt).time()
+        result = datetime.combine(ref_date, parsed_time)
+        return result.replace(tzinfo=CDT)
+    elif fmt in _MONTH_DAY:
+        # prefix the year so Feb 29 parses in leap years
+        parsed = datetime.strptime(f"{ref_date.year}/{time_str}", "%Y/" + fmt)
+        return parsed.replace(tzinfo=CDT)
     else:
-        # aware datetime - convert to CDT
-        return dt.astimezone(CDT)
+        parsed = datetime.strptime(time_str, fmt)
+        return parsed.replace(tzinfo=CDT)
 
-def parse_datetime_input(time_str: str, reference_date: datetime = None) -> datetime:
-    """Parse datetime input from user (supports various formats)"""
-    if reference_date is None:
-        reference_date = datetime.now(CDT)
-    
-    time_str = time_str.strip().upper()
-    
-    # accept a bunch of formats
-    formats = [
-        "%Y-%m-%d %H:%M",
-        "%m/%d/%Y %I:%M %p",
-        "%m/%d/%Y %H:%M",
-        "%m/%d %I:%M %p",
-        "%m/%d %H:%M",
-        "%H:%M",
-        "%I:%M %p",
-        "%I%p",
-        "%H"
-    ]
+@lru_cache(maxsize=512)
+def _parse_cached(time_str: str, ref_date: date) -> datetime:
+    """Parse normalized input against a reference day, repeats are a cache hit"""
+    # usually the first guess matches, so no ValueError gets raised at all
+    guesses = _guess_formats(time_str)
+    for fmt in guesses:
+        try:
+            return _parse_with_format(time_str, fmt, ref_date)
+        except ValueError:
+            continue
     
-    for fmt in formats:
+    # odd spacing or casing the guess didn't anticipate - try everything else
+    for fmt in _FORMATS:
+        if fmt in guesses:
+            continue
         try:
-            if fmt in ["%H:%M", "%I:%M %p", "%I%p", "%H"]:
-                # time only - use reference date
-                parsed_time = datetime.strptime(time_str, fmt).time()
-                result = datetime.combine(reference_date.date(), parsed_time)
-                return CDT.localize(result)
-            elif fmt == "%m/%d %H:%M":
-                # month/day with current year
-                parsed = datetime.strptime(f"{reference_date.year}/{time_str}", "%Y/%m/%d %H:%M")
-                return CDT.localize(parsed)
-            elif fmt == "%m/%d %I:%M %p":
-                parsed = datetime.strptime(f"{reference_date.year}/{time_str}", "%Y/%m/%d %I:%M %p")
-                return CDT.localize(parsed)
-            else:
-                parsed = datetime.strptime(time_str, fmt)
-                return CDT.localize(parsed)
+            return _parse_with_format(time_str, fmt, ref_date)
         except ValueError:
             continue
     
     raise ValueError(f"Could not parse time: {time_str}")
+
+def parse_datetime_input(time_str: str, reference_date: datetime = None) -> datetime:
+    """Parse datetime input from user (supports various formats)"""
+    if reference_date is None:
+        reference_date = datetime.now(CDT)
+    
+    # results only depend on the day, so key the cache on the date not the full datetime
+    return _parse_cached(time_str.strip().upper(), reference_date.date())